@@ -0,0 +1,152 @@
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+
+
+
+TOTD_MAP_UID = 'benchTotdMapUid000000000000'
+TOTD_MAP_TAGS = [14, 2, 5] # Ice, FullSpeed, LOL
+
+DISCORD_MESSAGE_PATTERN = re.compile('^/channels/([0-9]+)/messages$')
+TMX_MAP_INFO_PATTERN = re.compile('^/maps/get_map_info/uid/([A-Za-z0-9_]+)$')
+
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, content, status_code:int=200):
+        body = json.dumps(content).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length > 0 else b''
+
+
+
+"""
+FAKE TRACKMANIA.IO
+Serves a TOTD listing whose last day is today (UTC), so refresh_job stores a track that notify_job will match.
+"""
+class TmioHandler(FakeHandler):
+    def do_GET(self):
+        if self.path != '/totd/0':
+            return self.send_json({'error':'not found'}, 404)
+        now = datetime.utcnow()
+        days = [{'map' : {
+            'mapUid' : f"benchPastMapUid{d:02d}",
+            'name' : f"$o$FFFBench Day {d}",
+            'authorplayer' : {'name' : 'bench'},
+            'authorScore' : 45000 + d,
+            'thumbnailUrl' : f"http://127.0.0.1/thumbnails/{d}.jpg",
+        }} for d in range(1, now.day)]
+        days.append({'map' : {
+            'mapUid' : TOTD_MAP_UID,
+            'name' : '$o$s$0CFBench $FFFIce',
+            'authorplayer' : {'name' : 'bench'},
+            'authorScore' : 42123,
+            'thumbnailUrl' : 'http://127.0.0.1/thumbnails/totd.jpg',
+        }})
+        self.send_json({'year':now.year, 'month':now.month, 'days':days})
+
+
+
+"""
+FAKE TRACKMANIA.EXCHANGE
+Returns the fixed TOTD tags for any map uid.
+"""
+class TmxHandler(FakeHandler):
+    def do_GET(self):
+        match = TMX_MAP_INFO_PATTERN.match(self.path)
+        if not match:
+            return self.send_json({'error':'not found'}, 404)
+        tags = ','.join([str(t) for t in TOTD_MAP_TAGS])
+        self.send_json({'TrackUID':match.group(1), 'Tags':tags})
+
+
+
+"""
+FAKE DISCORD
+Accepts channel messages and command registrations, recording a receipt time for every message.
+GET '/_bench/stats' reports the recorded deliveries, POST '/_bench/reset' clears them.
+"""
+class DiscordState:
+    lock = threading.Lock()
+    latency_seconds = 0.0
+    message_times = []
+    channel_ids = set()
+
+class DiscordHandler(FakeHandler):
+    def do_GET(self):
+        if self.path != '/_bench/stats':
+            return self.send_json({'error':'not found'}, 404)
+        with DiscordState.lock:
+            times = list(DiscordState.message_times)
+            channels = len(DiscordState.channel_ids)
+        self.send_json({
+            'messages' : len(times),
+            'channels' : channels,
+            'first_message_time' : min(times) if times else None,
+            'last_message_time' : max(times) if times else None,
+        })
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.path == '/_bench/reset':
+            with DiscordState.lock:
+                DiscordState.message_times.clear()
+                DiscordState.channel_ids.clear()
+            return self.send_json({})
+        if self.path.startswith('/applications/'):
+            return self.send_json(json.loads(body or b'{}'), 201)
+        match = DISCORD_MESSAGE_PATTERN.match(self.path)
+        if not match:
+            return self.send_json({'error':'not found'}, 404)
+        if DiscordState.latency_seconds > 0:
+            time.sleep(DiscordState.latency_seconds)
+        with DiscordState.lock:
+            DiscordState.message_times.append(time.time())
+            DiscordState.channel_ids.add(match.group(1))
+            message_id = len(DiscordState.message_times)
+        self.send_json({'id':str(message_id), 'channel_id':match.group(1)})
+
+
+
+def serve(host:str='127.0.0.1', discord_latency_ms:float=0) -> dict:
+    DiscordState.latency_seconds = discord_latency_ms / 1000
+    urls = {}
+    for name, handler in [('TMIO_API_URL', TmioHandler), ('TMX_API_URL', TmxHandler), ('DISCORD_API_URL', DiscordHandler)]:
+        server = ThreadingHTTPServer((host, 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        urls[name] = f"http://{host}:{server.server_address[1]}"
+    return urls
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local stand-ins for trackmania.io, TMX and Discord')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--discord-latency-ms', type=float, default=0)
+    args = parser.parse_args()
+    urls = serve(host=args.host, discord_latency_ms=args.discord_latency_ms)
+    # first line of stdout is machine-readable so the benchmark runner can pick up the ports
+    print(json.dumps(urls), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,367 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+from bench.fakes import TOTD_MAP_TAGS
+
+
+
+"""
+BENCHMARK RUNNER
+Starts the fake trackmania.io/TMX/Discord services, a Postgres instance and the bot itself (uvicorn, as in the Procfile).
+For each scale: resets the database, seeds synthetic guilds & subscriptions, drives refresh_job -> notify_job through
+POST '/admin/database/refresh', then sends a concurrent load of slash commands to POST '/interaction'.
+Timings are written as json so runs can be compared against each other.
+
+Usage (from the repo root):
+    python -m bench.run --scales 10,100,1000 --output bench_output.json
+Results go to a file rather than stdout, since the db module echoes sql to stdout.
+Set BENCH_DATABASE_URL to use an existing (disposable!) database instead of starting a throwaway Postgres cluster.
+"""
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_KEY = 'bench-admin-key'
+BENCH_ENV = {
+    'ADMIN_KEY' : ADMIN_KEY,
+    'DISCORD_APP_ID' : '100000000000000000',
+    'DISCORD_BOT_TOKEN' : 'bench-bot-token',
+    'ENV_NAME' : 'bench',
+    'NOTIFICATIONS_ENABLED_DEFAULT' : 'true',
+    'VERIFY_SIGNATURES' : 'false',
+}
+
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for(check, timeout:float, interval:float=0.1, error:str='Timed out'):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except (requests.exceptions.RequestException, OSError):
+            pass
+        time.sleep(interval)
+    raise TimeoutError(error)
+
+def get_git_commit() -> str | None:
+    resp = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True)
+    return resp.stdout.strip() or None
+
+def percentile(values:list, pct:float) -> float | None:
+    # nearest-rank percentile, values must be sorted
+    if not values:
+        return None
+    rank = max(1, math.ceil(len(values) * pct / 100))
+    return values[rank - 1]
+
+
+
+"""
+LOCAL POSTGRES
+Throwaway cluster in a temp directory, torn down on exit. Requires initdb & pg_ctl on PATH (and a non-root user).
+"""
+class LocalPostgres:
+    def __init__(self):
+        self.data_dir = None
+        self.port = None
+
+    def start(self) -> str:
+        if not shutil.which('initdb') or not shutil.which('pg_ctl'):
+            raise RuntimeError('initdb/pg_ctl not found on PATH - install Postgres or set BENCH_DATABASE_URL')
+        self.data_dir = tempfile.mkdtemp(prefix='cotd-bench-pg-')
+        self.port = get_free_port()
+        subprocess.run(['initdb', '-D', self.data_dir, '-U', 'bench', '--auth=trust'], check=True, stdout=subprocess.DEVNULL)
+        options = f"-p {self.port} -k {self.data_dir} -c listen_addresses=127.0.0.1 -c fsync=off"
+        subprocess.run(['pg_ctl', '-D', self.data_dir, '-o', options, '-l', os.path.join(self.data_dir, 'postgres.log'), '-w', 'start'], check=True, stdout=subprocess.DEVNULL)
+        return f"postgres://bench@127.0.0.1:{self.port}/postgres"
+
+    def stop(self):
+        if self.data_dir:
+            subprocess.run(['pg_ctl', '-D', self.data_dir, '-m', 'fast', '-w', 'stop'], stdout=subprocess.DEVNULL)
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+            self.data_dir = None
+
+
+
+"""
+BOT PROCESS
+Runs the app exactly like production does, pointed at the fakes. Peak RSS is read from /proc, since the app is a child process.
+"""
+class BotProcess:
+    def __init__(self, env_vars:dict, verbose:bool=False):
+        self.env_vars = env_vars
+        self.verbose = verbose
+        self.port = get_free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.proc = None
+
+    def start(self):
+        cmd = [sys.executable, '-m', 'uvicorn', 'app:app', '--host', '127.0.0.1', '--port', str(self.port), '--workers', '1']
+        output = None if self.verbose else subprocess.DEVNULL
+        self.proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env={**os.environ, **self.env_vars}, stdout=output, stderr=output)
+        def is_up():
+            # fail fast instead of waiting out the timeout if the app crashed on startup
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"Bot exited during startup with code {self.proc.returncode}")
+            return requests.get(f"{self.base_url}/").status_code == 200
+        wait_for(is_up, timeout=60, error='Bot did not start')
+
+    def reset_peak_rss(self):
+        # writing 5 to clear_refs resets VmHWM on linux; best effort only
+        try:
+            with open(f"/proc/{self.proc.pid}/clear_refs", 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+
+    def peak_rss_kb(self) -> int | None:
+        try:
+            with open(f"/proc/{self.proc.pid}/status", 'r') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return None
+
+    def admin(self, path:str, **body) -> requests.Response:
+        return requests.post(f"{self.base_url}/admin{path}", data=json.dumps({'admin_key':ADMIN_KEY, **body}), headers={'Content-Type':'application/json'})
+
+    def stop(self):
+        if not self.proc:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+
+"""
+SEEDING
+Synthetic guilds, each subscribed to a handful of random styles with one role per style.
+A fixed fraction of guilds (match_ratio) gets exactly one subscription to a style the fake TOTD is tagged with,
+the rest only subscribe to non-matching styles - so each scale sends a known number of notifications.
+"""
+def seed_subscriptions(num_guilds:int, subs_per_guild:int, match_ratio:float, rng:random.Random) -> list:
+    import db
+    matching_ids = list(TOTD_MAP_TAGS)
+    other_ids = [int(k) for k in load_styles().keys() if int(k) not in TOTD_MAP_TAGS]
+    matching_guilds = set(rng.sample(range(num_guilds), round(num_guilds * match_ratio)))
+    rows = []
+    for g in range(num_guilds):
+        guild_id = 200000000000000000 + g
+        channel_ids = [300000000000000000 + g * 10 + c for c in range(3)]
+        if g in matching_guilds:
+            style_ids = [rng.choice(matching_ids)] + rng.sample(other_ids, min(subs_per_guild - 1, len(other_ids)))
+        else:
+            style_ids = rng.sample(other_ids, min(subs_per_guild, len(other_ids)))
+        for n, style_id in enumerate(style_ids):
+            rows.append({
+                'guild_id' : guild_id,
+                'channel_id' : rng.choice(channel_ids),
+                'role_id' : 400000000000000000 + g * 100 + n,
+                'style_id' : style_id,
+            })
+    engine = db.get_engine(echo=False)
+    with db.Session(engine) as session:
+        for i in range(0, len(rows), 5000):
+            session.execute(db.pg.insert(db.Subscription).values(rows[i:i+5000]))
+        session.commit()
+    engine.dispose()
+    return rows
+
+def load_styles() -> dict:
+    with open(os.path.join(REPO_ROOT, 'dat', 'styles.json'), 'r') as f:
+        return dict(json.load(f))
+
+
+
+"""
+FAN-OUT
+refresh_job stores the TOTD then schedules notify_job; we wait until the fake Discord has received every expected message.
+Fan-out is timed from the end of the refresh request (when notify_job has been scheduled) to the last delivery.
+"""
+def run_fanout(bot:BotProcess, discord_url:str, timeout:float) -> dict:
+    import db
+    requests.post(f"{discord_url}/_bench/reset")
+    start = time.time()
+    resp = bot.admin('/database/refresh', suppress_notifications=False)
+    refresh_end = time.time()
+    refresh_seconds = refresh_end - start
+    expected = len(db.get_notification_payloads())
+    stats = {}
+    def delivered():
+        stats.update(requests.get(f"{discord_url}/_bench/stats").json())
+        return stats['messages'] >= expected
+    try:
+        wait_for(delivered, timeout=timeout, interval=0.05)
+        timed_out = False
+    except TimeoutError:
+        timed_out = True
+    last = stats.get('last_message_time')
+    return {
+        'refresh_status' : resp.status_code,
+        'refresh_seconds' : refresh_seconds,
+        'expected_messages' : expected,
+        'delivered_messages' : stats.get('messages', 0),
+        'delivered_channels' : stats.get('channels', 0),
+        'timed_out' : timed_out,
+        'fanout_seconds' : (last - refresh_end) if last else None,
+        'pipeline_seconds' : (last - start) if last else None,
+    }
+
+
+
+"""
+INTERACTION LOAD
+Concurrent slash commands from the seeded guilds, weighted roughly like real usage.
+"""
+def build_interaction(rows:list, style_names:list, rng:random.Random) -> dict:
+    sub = rng.choice(rows)
+    command = rng.choices(['show', 'styles', 'subscribe', 'unsubscribe'], weights=[50, 20, 15, 15])[0]
+    options = []
+    if command == 'subscribe':
+        options = [{'name':'style', 'value':rng.choice(style_names)}, {'name':'role', 'value':str(sub['role_id'] + 50)}]
+    elif command == 'unsubscribe':
+        options = [{'name':'style', 'value':rng.choice(style_names)}]
+    return {
+        'type' : 2,
+        'guild_id' : str(sub['guild_id']),
+        'channel_id' : str(sub['channel_id']),
+        'data' : {'name':command, 'options':options},
+    }
+
+def run_interaction_load(bot:BotProcess, rows:list, num_requests:int, concurrency:int, rng:random.Random) -> dict:
+    style_names = list(load_styles().values())
+    bodies = [json.dumps(build_interaction(rows, style_names, rng)) for _ in range(num_requests)]
+    url = f"{bot.base_url}/interaction"
+    local = threading.local()
+    def send(body:str):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        t0 = time.perf_counter()
+        try:
+            ok = local.session.post(url, data=body, headers={'Content-Type':'application/json'}).status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        return time.perf_counter() - t0, ok
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, bodies))
+    elapsed = time.perf_counter() - start
+    latencies = sorted([r[0] * 1000 for r in results])
+    return {
+        'requests' : num_requests,
+        'concurrency' : concurrency,
+        'errors' : sum([1 for r in results if not r[1]]),
+        'seconds' : elapsed,
+        'throughput_rps' : num_requests / elapsed if elapsed > 0 else None,
+        'latency_ms' : {
+            'mean' : sum(latencies) / len(latencies) if latencies else None,
+            'p50' : percentile(latencies, 50),
+            'p95' : percentile(latencies, 95),
+            'p99' : percentile(latencies, 99),
+            'max' : latencies[-1] if latencies else None,
+        },
+    }
+
+
+
+def write_results(results:dict, path:str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    results = {
+        'git_commit' : get_git_commit(),
+        'started_at_utc' : datetime.utcnow().isoformat(),
+        'config' : {k:v for k,v in vars(args).items() if k != 'output'},
+        'scales' : [],
+    }
+    postgres = None
+    fakes = None
+    bot = None
+    try:
+        # external services
+        fakes = subprocess.Popen([sys.executable, '-m', 'bench.fakes', '--discord-latency-ms', str(args.discord_latency_ms)], cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+        urls = json.loads(fakes.stdout.readline())
+        database_url = os.environ.get('BENCH_DATABASE_URL')
+        if not database_url:
+            postgres = LocalPostgres()
+            database_url = postgres.start()
+        env_vars = {**BENCH_ENV, **urls, 'DATABASE_URL':database_url}
+        # db module reads env at import time, so only import it once the environment is in place
+        os.environ.update(env_vars)
+        os.chdir(REPO_ROOT)
+        sys.path.insert(0, REPO_ROOT)
+
+        bot = BotProcess(env_vars, verbose=args.verbose)
+        bot.start()
+        for num_guilds in args.scales:
+            bot.admin('/database/reset').raise_for_status()
+            t0 = time.perf_counter()
+            rows = seed_subscriptions(num_guilds, args.subs_per_guild, args.match_ratio, rng)
+            seed_seconds = time.perf_counter() - t0
+            bot.reset_peak_rss()
+            fanout = run_fanout(bot, urls['DISCORD_API_URL'], timeout=args.fanout_timeout)
+            interaction = run_interaction_load(bot, rows, args.requests, args.concurrency, rng)
+            scale = {
+                'guilds' : num_guilds,
+                'subscriptions' : len(rows),
+                'seed_seconds' : seed_seconds,
+                'fanout' : fanout,
+                'interaction' : interaction,
+                'peak_rss_kb' : bot.peak_rss_kb(),
+            }
+            results['scales'].append(scale)
+            # write as we go so finished scales survive a failure at a later one
+            write_results(results, args.output)
+            print(f"[bench] guilds={num_guilds} subs={len(rows)} fanout={fanout['delivered_messages']}/{fanout['expected_messages']} in {fanout['fanout_seconds']}s "
+                  f"p99={interaction['latency_ms']['p99']}ms errors={interaction['errors']} peak_rss={scale['peak_rss_kb']}kB", file=sys.stderr)
+        return results
+    finally:
+        write_results(results, args.output)
+        if bot:
+            bot.stop()
+        if fakes:
+            fakes.terminate()
+            fakes.wait()
+        if postgres:
+            postgres.stop()
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='End-to-end benchmark for the cotd style bot')
+    parser.add_argument('--scales', type=lambda s: [int(n) for n in s.split(',')], default=[10, 100, 1000], help='comma separated guild counts')
+    parser.add_argument('--subs-per-guild', type=int, default=3)
+    parser.add_argument('--match-ratio', type=float, default=0.5, help='fraction of guilds subscribed to a style of the fake totd')
+    parser.add_argument('--requests', type=int, default=500, help='interaction requests per scale')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--discord-latency-ms', type=float, default=0, help='artificial delay per fake discord message')
+    parser.add_argument('--fanout-timeout', type=float, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_output.json', help='json output path')
+    parser.add_argument('--verbose', action='store_true', help='show bot process output')
+    args = parser.parse_args()
+    if args.subs_per_guild < 1 or not 0 <= args.match_ratio <= 1:
+        parser.error('--subs-per-guild must be at least 1 and --match-ratio must be between 0 and 1')
+    run(args)
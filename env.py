@@ -11,6 +11,12 @@ NOTIFICATIONS_ENABLED_DEFAULT = True if os.environ['NOTIFICATIONS_ENABLED_DEFAUL
 VERIFY_SIGNATURES = True if os.environ['VERIFY_SIGNATURES'].strip().lower() == 'true' else False
 
 
+# base urls for external apis - overridable so the bot can be pointed at local stand-ins
+DISCORD_API_URL = os.environ.get('DISCORD_API_URL', 'https://discord.com/api').rstrip('/')
+TMIO_API_URL = os.environ.get('TMIO_API_URL', 'https://trackmania.io/api').rstrip('/')
+TMX_API_URL = os.environ.get('TMX_API_URL', 'https://trackmania.exchange/api').rstrip('/')
+
+
 # fix database url for heroku postgres
 DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql+psycopg2://')
 
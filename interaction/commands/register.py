@@ -6,7 +6,7 @@ import env
 def register_commands():
     with open('commands.json', 'r') as f:
         commands_json = json.load(f)
-    url = f"https://discord.com/api/applications/{env.DISCORD_APP_ID}/commands"
+    url = f"{env.DISCORD_API_URL}/applications/{env.DISCORD_APP_ID}/commands"
     for cmd in commands_json:
         resp = requests.post(url, data=json.dumps(cmd), headers=DISCORD_HEADERS)
         print(f"Registering command '/{cmd['name']}': {resp.status_code}")
@@ -48,7 +48,7 @@ def notify_job():
                 },
             ]
         }
-        target_url = f"https://discord.com/api/channels/{notif.channel_id}/messages"
+        target_url = f"{env.DISCORD_API_URL}/channels/{notif.channel_id}/messages"
         t = (notif.channel_id, target_url, payload)
         messages.append(t)
     # push to all subscribers
@@ -66,7 +66,7 @@ Scheduled job to retrieve the new COTD at 7pm CET / 1pm EST every day.
 """
 def refresh_job(suppress_notifications:bool=False):
     # retrieve map from trackmania.io
-    url = 'https://trackmania.io/api/totd/0'
+    url = f"{env.TMIO_API_URL}/totd/0"
     resp = requests.get(url, headers=env.FETCH_HEADERS)
     print(f"trackmania.io: {resp.status_code}")
     tmio_json = resp.json()
@@ -74,7 +74,7 @@ def refresh_job(suppress_notifications:bool=False):
     print(f"totd map_uid: {map_uid}")
 
     # retrieve same map from tmx
-    url = f"https://trackmania.exchange/api/maps/get_map_info/uid/{map_uid}"
+    url = f"{env.TMX_API_URL}/maps/get_map_info/uid/{map_uid}"
     resp = requests.get(url, headers=env.FETCH_HEADERS)
     print(f"tmx: {resp.status_code}")
     try: